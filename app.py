@@ -1,43 +1,113 @@
 from __future__ import annotations
 
-import os
+import io
 import json
-import orjson
 import streamlit as st
 
-from prompts import (
-	ANALYZER_SYSTEM_PROMPT,
-	ANALYZER_USER_TEMPLATE,
-	EDITOR_SYSTEM_PROMPT,
-	EDITOR_USER_TEMPLATE,
-)
 from llm_client import chat_json, chat_text
-from pdf_utils import extract_text_from_pdf
+from pdf_utils import extract_text_from_pdf_with_stats
+from pipeline import ANALYZER_MODEL, EDITOR_MODEL, build_analyzer_messages, build_editor_messages, stage_result_key
+from result_store import ResultStore, text_hash
 from salary_estimator import estimate_salary_from_resume
 
-ANALYZER_MODEL = os.getenv("ANALYZER_MODEL", "gpt-4o-mini")
-EDITOR_MODEL = os.getenv("EDITOR_MODEL", "gpt-4o")
-
 st.set_page_config(page_title="Нейро‑HR — анализ и редактура резюме", layout="wide")
 
 st.title("🎯 Нейро‑HR — анализ и редактура резюме")
 
-with st.sidebar:
+
+@st.fragment
+def render_inputs():
+	"""Sidebar inputs; typing the JD reruns only this fragment, a new PDF or JD reruns the whole app."""
 	st.header("Входные данные")
-	resume_pdf = st.file_uploader("Загрузите PDF резюме", type=["pdf"])  # type: ignore
-	job_description = st.text_area("Описание вакансии", height=180)
+	resume_pdf = st.file_uploader("Загрузите PDF резюме", type=["pdf"], key="resume_pdf")  # type: ignore
+	# Новое резюме меняет отчёты во всех секциях, а не только в sidebar
+	file_id = resume_pdf.file_id if resume_pdf is not None else None
+	if st.session_state.get("resume_file_id") != file_id:
+		st.session_state["resume_file_id"] = file_id
+		st.rerun(scope="app")
+	if resume_pdf is not None:
+		_, clean_stats = _extract_resume_text(resume_pdf.getvalue())
+		if clean_stats["chars_removed"]:
+			st.caption(
+				f"Очистка текста: −{clean_stats['chars_removed']} символов "
+				f"(~{clean_stats['tokens_removed']} токенов на каждый вызов LLM)"
+			)
+	st.text_area("Описание вакансии", height=180, key="job_description")
+	# text_area отдаёт значение по blur/Ctrl+Enter, так что полный rerun — один на правку, а не на символ
+	job_description = st.session_state.get("job_description") or ""
+	if st.session_state.get("committed_job_description", "") != job_description:
+		st.session_state["committed_job_description"] = job_description
+		st.rerun(scope="app")
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def _extract_resume_text(pdf_bytes: bytes) -> tuple[str, dict]:
+	return extract_text_from_pdf_with_stats(io.BytesIO(pdf_bytes))
+
+
+with st.sidebar:
+	render_inputs()
 
 
 def load_resume_text() -> str:
+	resume_pdf = st.session_state.get("resume_pdf")
 	if resume_pdf is not None:
-		# Save to temp and extract
-		tmp_path = os.path.join(st.session_state.get("tmp_dir", "."), "_resume_tmp.pdf")
-		with open(tmp_path, "wb") as f:
-			f.write(resume_pdf.getbuffer())
-		return extract_text_from_pdf(tmp_path)
+		# Extracted text is memoized by file content
+		return _extract_resume_text(resume_pdf.getvalue())[0]
 	return ""
 
 
+def get_job_description() -> str:
+	return st.session_state.get("job_description") or ""
+
+
+@st.cache_resource
+def get_result_store() -> ResultStore:
+	"""Одно хранилище на процесс: результаты общие для всех сессий."""
+	return ResultStore()
+
+
+def stage_key(stage: str, resume_text: str, analysis_json: dict | None = None) -> str:
+	return stage_result_key(text_hash(resume_text), get_job_description(), stage, analysis_json)
+
+
+def remember_key(stage: str, key: str) -> None:
+	st.session_state.setdefault("result_keys", {})[stage] = key
+	# Ключи дублируются в URL: повторно открытая вкладка восстанавливает результаты без PDF и JD
+	if st.query_params.get(stage) != key:
+		st.query_params[stage] = key
+
+
+def save_result(stage: str, key: str, value) -> None:
+	get_result_store().put(key, value)
+	remember_key(stage, key)
+
+
+def get_result(stage: str):
+	"""Результат этапа для текущих резюме и JD; без загруженного резюме — по ключу из сессии или URL.
+
+	Результат Редактора ищется по ключу текущего анализа, поэтому после смены
+	резюме или повторного анализа старый текст не показывается.
+	"""
+	store = get_result_store()
+	keys = st.session_state.setdefault("result_keys", {})
+	resume_text = load_resume_text()
+	if not resume_text:
+		key = keys.get(stage) or st.query_params.get(stage)
+		return store.get(key) if key else None
+	analysis_json = None
+	if stage == "editor":
+		analysis_json = get_result("analyzer")
+		if analysis_json is None:
+			return None
+	key = stage_key(stage, resume_text, analysis_json)
+	value = store.get(key)
+	if value is not None:
+		remember_key(stage, key)
+	return value
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
 def format_analysis_report(analysis_json: dict) -> str:
 	"""Форматирует JSON-отчёт Анализатора в человекочитаемый Markdown"""
 	report = []
@@ -274,93 +344,126 @@ def display_salary_report(salary_json: dict):
 		st.write(salary_json["notes"])
 
 
-st.header("🔹 Анализатор")
-if st.button("Запустить анализ"):
-	resume_text = load_resume_text()
-	if not resume_text:
-		st.warning("Требуется загрузить PDF резюме")
-	else:
-		user_prompt = ANALYZER_USER_TEMPLATE.format(
-			resume_text=resume_text,
-			job_description=job_description or "",
-		)
-		messages = [
-			{"role": "system", "content": ANALYZER_SYSTEM_PROMPT},
-			{"role": "user", "content": user_prompt},
-		]
-		with st.spinner("Модель анализирует резюме…"):
-			try:
-				analysis_json = chat_json(
-					messages=messages,
-					model=ANALYZER_MODEL,
-					temperature=0.1,
-				)
-				st.session_state["analysis_json"] = analysis_json
-				st.success("Готово: отчёт сформирован")
-			except Exception as e:
-				st.error(f"Ошибка LLM: {e}")
+@st.fragment
+def render_analyzer_section():
+	st.header("🔹 Анализатор")
+	notice = st.session_state.pop("analyzer_notice", None)
+	if notice:
+		st.success(notice)
+	if st.button("Запустить анализ"):
+		resume_text = load_resume_text()
+		if not resume_text:
+			st.warning("Требуется загрузить PDF резюме")
+		else:
+			key = stage_key("analyzer", resume_text)
+			cached = get_result_store().get(key)
+			if cached is not None:
+				save_result("analyzer", key, cached)
+				st.session_state["analyzer_notice"] = "Готово: отчёт взят из общего хранилища"
+			else:
+				messages = build_analyzer_messages(resume_text, get_job_description())
+				with st.spinner("Модель анализирует резюме…"):
+					try:
+						analysis_json = chat_json(
+							messages=messages,
+							model=ANALYZER_MODEL,
+							temperature=0.1,
+						)
+						save_result("analyzer", key, analysis_json)
+						st.session_state["analyzer_notice"] = "Готово: отчёт сформирован"
+					except Exception as e:
+						st.error(f"Ошибка LLM: {e}")
+			if "analyzer_notice" in st.session_state:
+				# Новый анализ меняет ключ Редактора: перерисовываем все секции, а не только эту
+				st.rerun(scope="app")
 
-# Показываем результаты анализа
-if "analysis_json" in st.session_state:
-	analysis_json = st.session_state["analysis_json"]
-	st.markdown(format_analysis_report(analysis_json))
+	# Показываем результаты анализа
+	analysis_json = get_result("analyzer")
+	if analysis_json is not None:
+		st.markdown(format_analysis_report(analysis_json))
 
 
-st.header("🔹 Редактор")
-if st.button("Сгенерировать улучшенное резюме"):
-	resume_text = load_resume_text()
-	if not resume_text:
-		st.warning("Требуется загрузить PDF резюме")
-	else:
-		if "analysis_json" not in st.session_state:
-			st.info("Сначала запустите Анализатор — его вывод используется Редактором")
-		analysis_json_str = orjson.dumps(st.session_state.get("analysis_json", {})).decode()
-		user_prompt = EDITOR_USER_TEMPLATE.format(
-			analyzer_json=analysis_json_str,
-			resume_text=resume_text,
-			job_description=job_description or "",
-		)
-		messages = [
-			{"role": "system", "content": EDITOR_SYSTEM_PROMPT},
-			{"role": "user", "content": user_prompt},
-		]
-		with st.spinner("Модель переписывает резюме…"):
-			try:
-				editor_output = chat_text(
-					messages=messages,
-					model=EDITOR_MODEL,
-					temperature=0.3,
+@st.fragment
+def render_editor_section():
+	st.header("🔹 Редактор")
+	draft = None
+	if st.button("Сгенерировать улучшенное резюме"):
+		resume_text = load_resume_text()
+		if not resume_text:
+			st.warning("Требуется загрузить PDF резюме")
+		else:
+			analysis_json = get_result("analyzer")
+			if analysis_json is None:
+				st.info("Сначала запустите Анализатор — без его отчёта результат Редактора не сохраняется")
+			key = stage_key("editor", resume_text, analysis_json)
+			cached = get_result_store().get(key) if analysis_json is not None else None
+			if cached is not None:
+				save_result("editor", key, cached)
+				st.success("Готово: резюме взято из общего хранилища")
+			else:
+				messages, handoff_stats = build_editor_messages(
+					analysis_json or {},
+					resume_text,
+					get_job_description(),
 				)
-				st.session_state["editor_output"] = editor_output
-				st.success("Готово: резюме сгенерировано")
-			except Exception as e:
-				st.error(f"Ошибка LLM: {e}")
+				with st.spinner("Модель переписывает резюме…"):
+					try:
+						editor_output = chat_text(
+							messages=messages,
+							model=EDITOR_MODEL,
+							temperature=0.3,
+						)
+						if analysis_json is not None:
+							save_result("editor", key, editor_output)
+						else:
+							draft = editor_output
+						st.success("Готово: резюме сгенерировано")
+						st.caption(
+							f"Вход Редактора от Анализатора: ~{handoff_stats['handoff_tokens']} токенов "
+							f"вместо ~{handoff_stats['full_tokens']} (сэкономлено ~{handoff_stats['saved_tokens']})"
+						)
+					except Exception as e:
+						st.error(f"Ошибка LLM: {e}")
 
-if "editor_output" in st.session_state:
-	st.subheader("Итог (Markdown с разделами)")
-	st.markdown(st.session_state["editor_output"])  # Editor выводит Маркдаун и списки
+	editor_output = draft if draft is not None else get_result("editor")
+	if editor_output is not None:
+		st.subheader("Итог (Markdown с разделами)")
+		st.markdown(editor_output)  # Editor выводит Маркдаун и списки
 
 
-st.header("🔹 Оценка зарплаты")
-if st.button("Оценить зарплату"):
-	resume_text = load_resume_text()
-	if not resume_text:
-		st.warning("Требуется загрузить PDF резюме")
-	else:
-		with st.spinner("Модель оценивает зарплату…"):
-			try:
-				salary_json = estimate_salary_from_resume(
-					resume_text=resume_text,
-					job_description=job_description or None,
-				)
-				st.session_state["salary_json"] = salary_json
-				st.success("Готово: оценка зарплаты сформирована")
-			except Exception as e:
-				st.error(f"Ошибка LLM: {e}")
-
-# Показываем результаты оценки зарплаты
-if "salary_json" in st.session_state:
-	salary_json = st.session_state["salary_json"]
-	display_salary_report(salary_json)
+@st.fragment
+def render_salary_section():
+	st.header("🔹 Оценка зарплаты")
+	if st.button("Оценить зарплату"):
+		resume_text = load_resume_text()
+		if not resume_text:
+			st.warning("Требуется загрузить PDF резюме")
+		else:
+			key = stage_key("salary", resume_text)
+			cached = get_result_store().get(key)
+			if cached is not None:
+				save_result("salary", key, cached)
+				st.success("Готово: оценка зарплаты взята из общего хранилища")
+			else:
+				with st.spinner("Модель оценивает зарплату…"):
+					try:
+						salary_json = estimate_salary_from_resume(
+							resume_text=resume_text,
+							job_description=get_job_description() or None,
+						)
+						save_result("salary", key, salary_json)
+						st.success("Готово: оценка зарплаты сформирована")
+					except Exception as e:
+						st.error(f"Ошибка LLM: {e}")
+
+	# Показываем результаты оценки зарплаты
+	salary_json = get_result("salary")
+	if salary_json is not None:
+		display_salary_report(salary_json)
+
+
+render_analyzer_section()
+render_editor_section()
+render_salary_section()
 
 st.divider()
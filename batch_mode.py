@@ -0,0 +1,319 @@
+"""Пакетный (офлайн) режим через Batch API: submit сейчас, collect потом.
+
+Фаза 1 — Анализатор и оценка зарплаты для всех резюме одним batch-файлом.
+Фаза 2 — Редактор, запросы которого собираются только после получения
+результатов Анализатора. custom_id = "<хэш резюме>:<этап>". Результаты
+пишутся в <work-dir>/results/<хэш>.json с теми же полями, что хранит
+интерактивное приложение: analysis_json, salary_json, editor_output, и
+в общее хранилище результатов (result_store), откуда их подхватит app.py.
+
+	python batch_mode.py submit resumes/*.pdf --jd jd.txt --work-dir bulk_run
+	python batch_mode.py collect --work-dir bulk_run --wait
+	python batch_mode.py run resumes/*.pdf --work-dir bulk_run --stand-in
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import sys
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import orjson
+
+from llm_client import get_openai_client
+from pdf_utils import extract_text_from_pdf
+from pipeline import STAGES, build_stage_messages, stage_result_key
+from result_store import ResultStore, text_hash
+
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+FIRST_PHASE_STAGES = ("analyzer", "salary")
+FINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+RESULT_FIELDS = {"analyzer": "analysis_json", "salary": "salary_json", "editor": "editor_output"}
+
+
+def make_custom_id(resume_id: str, stage: str) -> str:
+	return f"{resume_id}:{stage}"
+
+
+def split_custom_id(custom_id: str) -> Tuple[str, str]:
+	resume_id, stage = custom_id.rsplit(":", 1)
+	return resume_id, stage
+
+
+def build_batch_request(
+	resume_id: str,
+	stage: str,
+	resume_text: str,
+	job_description: str = "",
+	analysis_json: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+	"""Одна строка batch JSONL с теми же model/temperature, что и в приложении."""
+	params = STAGES[stage]
+	body: Dict[str, Any] = {
+		"model": params["model"],
+		"temperature": params["temperature"],
+		"messages": build_stage_messages(stage, resume_text, job_description, analysis_json),
+	}
+	if params["json"]:
+		body["response_format"] = {"type": "json_object"}
+	return {
+		"custom_id": make_custom_id(resume_id, stage),
+		"method": "POST",
+		"url": BATCH_ENDPOINT,
+		"body": body,
+	}
+
+
+def write_jsonl(path: str, records: Iterable[Dict[str, Any]]) -> int:
+	count = 0
+	with open(path, "wb") as f:
+		for record in records:
+			f.write(orjson.dumps(record) + b"\n")
+			count += 1
+	return count
+
+
+def submit_batch(client: Any, jsonl_path: str) -> str:
+	with open(jsonl_path, "rb") as f:
+		input_file = client.files.create(file=f, purpose="batch")
+	batch = client.batches.create(
+		input_file_id=input_file.id,
+		endpoint=BATCH_ENDPOINT,
+		completion_window="24h",
+	)
+	return batch.id
+
+
+def poll_batch(client: Any, batch_id: str, wait: bool = False, poll_interval: float = 30.0) -> Any:
+	batch = client.batches.retrieve(batch_id)
+	while wait and batch.status not in FINAL_STATUSES:
+		time.sleep(poll_interval)
+		batch = client.batches.retrieve(batch_id)
+	return batch
+
+
+def collect_batch(client: Any, batch: Any) -> Tuple[Dict[str, Any], Dict[str, str]]:
+	"""Разбирает output/error файлы пакета: {custom_id: результат} и {custom_id: ошибка}.
+
+	Ответы JSON-этапов декодируются так же, как chat_json, Редактора — как chat_text.
+	"""
+	results: Dict[str, Any] = {}
+	errors: Dict[str, str] = {}
+	for file_id in (batch.output_file_id, batch.error_file_id):
+		if not file_id:
+			continue
+		for line in client.files.content(file_id).content.splitlines():
+			if not line.strip():
+				continue
+			record = orjson.loads(line)
+			custom_id = record["custom_id"]
+			response = record.get("response") or {}
+			if record.get("error") or response.get("status_code") != 200:
+				errors[custom_id] = str(record.get("error") or response.get("body"))
+				continue
+			content = response["body"]["choices"][0]["message"]["content"] or ""
+			_, stage = split_custom_id(custom_id)
+			try:
+				results[custom_id] = orjson.loads(content or "{}") if STAGES[stage]["json"] else content
+			except orjson.JSONDecodeError as e:
+				errors[custom_id] = f"invalid JSON: {e}"
+	return results, errors
+
+
+class BulkRun:
+	"""Состояние прогона в work-dir: manifest.json, тексты резюме, запросы и результаты."""
+
+	def __init__(self, work_dir: str, store: Optional[ResultStore] = None) -> None:
+		self.work_dir = work_dir
+		self.store = store
+		self.manifest_path = os.path.join(work_dir, "manifest.json")
+		self.manifest: Dict[str, Any] = {}
+		if os.path.exists(self.manifest_path):
+			with open(self.manifest_path, "rb") as f:
+				self.manifest = orjson.loads(f.read())
+
+	def _path(self, *parts: str) -> str:
+		return os.path.join(self.work_dir, *parts)
+
+	def save(self) -> None:
+		with open(self.manifest_path, "wb") as f:
+			f.write(orjson.dumps(self.manifest, option=orjson.OPT_INDENT_2))
+
+	def resume_text(self, resume_id: str) -> str:
+		with open(self._path("texts", f"{resume_id}.txt"), encoding="utf-8") as f:
+			return f.read()
+
+	def load_result(self, resume_id: str) -> Dict[str, Any]:
+		path = self._path("results", f"{resume_id}.json")
+		if os.path.exists(path):
+			with open(path, "rb") as f:
+				return orjson.loads(f.read())
+		return {
+			"source": self.manifest["resumes"][resume_id],
+			"resume_hash": resume_id,
+			"errors": {},
+		}
+
+	def save_result(self, resume_id: str, result: Dict[str, Any]) -> None:
+		with open(self._path("results", f"{resume_id}.json"), "wb") as f:
+			f.write(orjson.dumps(result, option=orjson.OPT_INDENT_2))
+
+	def submit(self, client: Any, paths: List[str], job_description: str = "") -> str:
+		"""Извлекает тексты, собирает фазу 1 (Анализатор + зарплата) и отправляет пакет."""
+		if self.manifest.get("phase") not in (None, "done"):
+			raise RuntimeError(f"в {self.work_dir} уже идёт прогон (фаза {self.manifest['phase']})")
+		# Результаты прошлого прогона (другой JD, другие ошибки) не должны смешиваться с новыми
+		for name in ("texts", "results"):
+			shutil.rmtree(self._path(name), ignore_errors=True)
+			os.makedirs(self._path(name))
+
+		resumes: Dict[str, str] = {}
+		for path in paths:
+			if path.lower().endswith(".pdf"):
+				text = extract_text_from_pdf(path)
+			else:
+				with open(path, encoding="utf-8") as f:
+					text = f.read()
+			if not text.strip():
+				print(f"пропущено (пустой текст): {path}", file=sys.stderr)
+				continue
+			resume_id = text_hash(text)
+			resumes.setdefault(resume_id, path)
+			with open(self._path("texts", f"{resume_id}.txt"), "w", encoding="utf-8") as f:
+				f.write(text)
+		if not resumes:
+			raise ValueError("нет ни одного резюме с текстом")
+
+		self.manifest = {"job_description": job_description, "resumes": resumes, "batches": {}}
+		requests_path = self._path("requests_analyze.jsonl")
+		write_jsonl(requests_path, (
+			build_batch_request(resume_id, stage, self.resume_text(resume_id), job_description)
+			for resume_id in resumes
+			for stage in FIRST_PHASE_STAGES
+		))
+		self.manifest["batches"]["analyze"] = submit_batch(client, requests_path)
+		self.manifest["phase"] = "analyze"
+		self.save()
+		return self.manifest["batches"]["analyze"]
+
+	def _store(self, results: Dict[str, Any], errors: Dict[str, str]) -> None:
+		job_description = self.manifest.get("job_description", "")
+		touched: Dict[str, Dict[str, Any]] = {}
+		for custom_id, value in results.items():
+			resume_id, stage = split_custom_id(custom_id)
+			result = touched.setdefault(resume_id, self.load_result(resume_id))
+			result[RESULT_FIELDS[stage]] = value
+			analysis_json = result.get("analysis_json") if stage == "editor" else None
+			if self.store is not None and (stage != "editor" or analysis_json is not None):
+				# Те же ключи, что у приложения: результат сразу доступен рекрутерам
+				self.store.put(stage_result_key(resume_id, job_description, stage, analysis_json), value)
+		for custom_id, error in errors.items():
+			resume_id, stage = split_custom_id(custom_id)
+			touched.setdefault(resume_id, self.load_result(resume_id))["errors"][stage] = error
+		for resume_id, result in touched.items():
+			self.save_result(resume_id, result)
+
+	def collect(self, client: Any, wait: bool = False, poll_interval: float = 30.0) -> str:
+		"""Забирает готовую фазу и двигает прогон дальше. Возвращает текущую фазу."""
+		while self.manifest.get("phase") in ("analyze", "edit"):
+			phase = self.manifest["phase"]
+			batch = poll_batch(client, self.manifest["batches"][phase], wait, poll_interval)
+			if batch.status not in FINAL_STATUSES:
+				print(f"фаза {phase}: пакет {batch.id} в статусе {batch.status}")
+				return phase
+			results, errors = collect_batch(client, batch)
+			if batch.status != "completed":
+				# expired/cancelled/failed: забираем то, что успело выполниться,
+				# остальные запросы фазы записываем как ошибки и идём дальше
+				for custom_id in self._request_ids(phase):
+					if custom_id not in results and custom_id not in errors:
+						errors[custom_id] = f"batch {batch.status}"
+			self._store(results, errors)
+			print(f"фаза {phase}: получено {len(results)}, ошибок {len(errors)}")
+
+			if phase == "edit":
+				self.manifest["phase"] = "done"
+			else:
+				self._submit_editor(client, results)
+			self.save()
+		return self.manifest.get("phase", "")
+
+	def _request_ids(self, phase: str) -> List[str]:
+		path = self._path(f"requests_{phase}.jsonl")
+		with open(path, "rb") as f:
+			return [orjson.loads(line)["custom_id"] for line in f if line.strip()]
+
+	def _submit_editor(self, client: Any, results: Dict[str, Any]) -> None:
+		job_description = self.manifest.get("job_description", "")
+		analyses = {
+			split_custom_id(custom_id)[0]: value
+			for custom_id, value in results.items()
+			if split_custom_id(custom_id)[1] == "analyzer"
+		}
+		if not analyses:
+			self.manifest["phase"] = "done"
+			return
+		requests_path = self._path("requests_edit.jsonl")
+		write_jsonl(requests_path, (
+			build_batch_request(resume_id, "editor", self.resume_text(resume_id), job_description, analysis)
+			for resume_id, analysis in analyses.items()
+		))
+		self.manifest["batches"]["edit"] = submit_batch(client, requests_path)
+		self.manifest["phase"] = "edit"
+
+
+def main(argv: List[str] | None = None) -> int:
+	parser = argparse.ArgumentParser(description="Пакетная обработка резюме через Batch API")
+	sub = parser.add_subparsers(dest="command", required=True)
+	for name in ("submit", "run"):
+		p = sub.add_parser(name)
+		p.add_argument("paths", nargs="+", help="PDF или .txt резюме")
+		p.add_argument("--jd", help="файл с описанием вакансии")
+	collect_parser = sub.add_parser("collect")
+	collect_parser.add_argument("--wait", action="store_true", help="ждать завершения всех фаз")
+	for p in sub.choices.values():
+		p.add_argument("--work-dir", required=True)
+		p.add_argument(
+			"--poll-interval", type=float, default=None, help="секунд между опросами (по умолчанию 30, с --stand-in 0.2)"
+		)
+		p.add_argument("--no-store", action="store_true", help="не записывать результаты в общее хранилище")
+	sub.choices["run"].add_argument(
+		"--stand-in", action="store_true", help="локальный mock Batch API вместо OpenAI"
+	)
+	args = parser.parse_args(argv)
+	if args.poll_interval is None:
+		# Mock завершает пакет за пару опросов — ждать по 30 с незачем
+		args.poll_interval = 0.2 if getattr(args, "stand_in", False) else 30.0
+
+	if getattr(args, "stand_in", False):
+		from mock_openai import start_mock_llm
+
+		server = start_mock_llm()
+		os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{server.server_address[1]}/v1"
+		os.environ.setdefault("OPENAI_API_KEY", "stand-in")
+
+	client = get_openai_client()
+	os.makedirs(args.work_dir, exist_ok=True)
+	run = BulkRun(args.work_dir, store=None if args.no_store else ResultStore())
+
+	if args.command in ("submit", "run"):
+		job_description = ""
+		if args.jd:
+			with open(args.jd, encoding="utf-8") as f:
+				job_description = f.read()
+		batch_id = run.submit(client, args.paths, job_description)
+		print(f"отправлен пакет {batch_id} ({len(run.manifest['resumes'])} резюме)")
+		if args.command == "submit":
+			return 0
+
+	phase = run.collect(client, wait=args.command == "run" or args.wait, poll_interval=args.poll_interval)
+	if phase == "done":
+		print(f"готово: {os.path.join(args.work_dir, 'results')}")
+	return 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Tuple
+
+import orjson
+
+from llm_client import estimate_tokens
+
+
+SEVERITY_SHORT = {"high": "H", "medium": "M", "low": "L"}
+
+
+def _clean(value: Any) -> str:
+	return " ".join(str(value).split())
+
+
+def build_editor_handoff(analysis_json: Dict[str, Any]) -> str:
+	"""Сжимает отчёт Анализатора до того, что реально использует Редактор.
+
+	Оставляет top_issues, missing_data, candidate_questions, priority_fix_list
+	и keywords_match.missing; оценки с обоснованиями, риски и найденные
+	ключевые слова отбрасываются. Формат — короткие строки с метками секций.
+	"""
+	lines: List[str] = []
+
+	issues = analysis_json.get("top_issues") or []
+	if issues:
+		lines.append("ПРОБЛЕМЫ (H/M/L — критичность; проблема | почему | решение):")
+		for issue in issues:
+			if not isinstance(issue, dict):
+				lines.append(f"- {_clean(issue)}")
+				continue
+			sev = SEVERITY_SHORT.get(str(issue.get("severity", "medium")).lower(), "M")
+			parts = [_clean(issue.get(k, "")) for k in ("issue", "why", "fix_suggestion")]
+			lines.append(f"{sev} " + " | ".join(p for p in parts if p))
+
+	missing = analysis_json.get("missing_data") or []
+	if missing:
+		lines.append("НЕТ ДАННЫХ:")
+		for item in missing:
+			if isinstance(item, dict):
+				lines.append(f"- {_clean(item.get('field', '?'))}: {_clean(item.get('note', ''))}")
+			else:
+				lines.append(f"- {_clean(item)}")
+
+	keywords = (analysis_json.get("keywords_match") or {}).get("missing") or []
+	if keywords:
+		lines.append("НЕТ КЛЮЧЕВЫХ СЛОВ: " + ", ".join(_clean(k) for k in keywords))
+
+	fixes = analysis_json.get("priority_fix_list") or []
+	if fixes:
+		lines.append("ПЛАН:")
+		lines.extend(f"{i}. {_clean(fix)}" for i, fix in enumerate(fixes, 1))
+
+	questions = analysis_json.get("candidate_questions") or []
+	if questions:
+		lines.append("ВОПРОСЫ:")
+		lines.extend(f"- {_clean(q)}" for q in questions)
+
+	return "\n".join(lines) if lines else "—"
+
+
+def editor_handoff_with_stats(analysis_json: Dict[str, Any]) -> Tuple[str, Dict[str, int]]:
+	"""Возвращает сжатый handoff и сравнение с полным JSON-дампом в токенах."""
+	handoff = build_editor_handoff(analysis_json)
+	full_tokens = estimate_tokens(orjson.dumps(analysis_json).decode())
+	handoff_tokens = estimate_tokens(handoff)
+	stats = {
+		"full_tokens": full_tokens,
+		"handoff_tokens": handoff_tokens,
+		"saved_tokens": max(0, full_tokens - handoff_tokens),
+	}
+	return handoff, stats
@@ -13,6 +13,13 @@ def get_openai_client() -> OpenAI:
         raise RuntimeError("OPENAI_API_KEY is not set")
     return OpenAI(api_key=api_key, base_url=base_url)
 
+def estimate_tokens(text: str) -> int:
+	"""Rough token count for budgeting (≈4 UTF-8 bytes per token, no tokenizer needed)."""
+	if not text:
+		return 0
+	return max(1, (len(text.encode("utf-8")) + 3) // 4)
+
+
 def chat_json(
 	messages: List[Dict[str, Any]],
 	model: str,
@@ -0,0 +1,397 @@
+"""Нагрузочный прогон app.py: N параллельных сессий против локального mock-LLM.
+
+Поднимает настоящий `streamlit run app.py` и mock OpenAI-совместимый endpoint,
+затем каждая сессия по websocket-протоколу Streamlit проходит сценарий
+upload → анализ → редактор → зарплата, как это делает браузер. AppTest для
+этого не годится: он подменяет глобальный Runtime и не рассчитан на потоки.
+Для каждого N печатается строка кривой ёмкости: латентность перезапусков,
+CPU процесса сервера, прирост RSS на сессию и пик потоков сервера (Linux, /proc).
+
+	python load_test.py --sessions 1,2,4,8,16 --llm-latency 0.2 --json capacity.json
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import itertools
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List
+
+import orjson
+
+from mock_openai import start_mock_llm
+
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+
+
+def make_sample_pdf(text_lines: List[str]) -> bytes:
+	"""Минимальный одностраничный PDF с текстом (латиница, Helvetica)."""
+	ops = ["BT", "/F1 11 Tf", "14 TL", "50 780 Td"]
+	for line in text_lines:
+		escaped = line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+		ops.append(f"({escaped}) Tj T*")
+	ops.append("ET")
+	stream = "\n".join(ops).encode("latin-1")
+	objects = [
+		b"<< /Type /Catalog /Pages 2 0 R >>",
+		b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+		b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents 4 0 R /Resources << /Font << /F1 5 0 R >> >> >>",
+		b"<< /Length " + str(len(stream)).encode() + b" >>\nstream\n" + stream + b"\nendstream",
+		b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+	]
+	out = bytearray(b"%PDF-1.4\n")
+	offsets = []
+	for i, obj in enumerate(objects, 1):
+		offsets.append(len(out))
+		out += f"{i} 0 obj\n".encode() + obj + b"\nendobj\n"
+	xref = len(out)
+	out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+	for off in offsets:
+		out += f"{off:010d} 00000 n \n".encode()
+	out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+	return bytes(out)
+
+
+def sample_resume_pdf(index: int) -> bytes:
+	"""Уникальное резюме на сессию, чтобы общее хранилище не подменяло вызовы LLM."""
+	return make_sample_pdf([
+		f"Candidate {index} - Python developer",
+		"Experience: 2019-2024, Backend developer, Example LLC",
+		"Skills: Python, Django, PostgreSQL, Docker",
+	])
+
+
+def _free_port() -> int:
+	with socket.socket() as sock:
+		sock.bind(("127.0.0.1", 0))
+		return sock.getsockname()[1]
+
+
+def start_app_server(
+	llm_base_url: str, store_dir: str, startup_timeout: float = 60.0
+) -> tuple[subprocess.Popen, str]:
+	"""Запускает app.py отдельным процессом с хранилищем в store_dir и ждёт /_stcore/health."""
+	import requests
+
+	port = _free_port()
+	env = dict(
+		os.environ,
+		OPENAI_BASE_URL=llm_base_url,
+		OPENAI_API_KEY="load-test",
+		RESULT_STORE_DIR=store_dir,
+	)
+	proc = subprocess.Popen(
+		[
+			sys.executable, "-m", "streamlit", "run", APP_PATH,
+			"--server.headless=true",
+			f"--server.port={port}",
+			"--server.address=127.0.0.1",
+			"--server.enableXsrfProtection=false",
+			"--server.fileWatcherType=none",
+			"--browser.gatherUsageStats=false",
+		],
+		env=env,
+		stdout=subprocess.DEVNULL,
+		stderr=subprocess.DEVNULL,
+	)
+	base_url = f"http://127.0.0.1:{port}"
+	deadline = time.monotonic() + startup_timeout
+	while time.monotonic() < deadline:
+		if proc.poll() is not None:
+			raise RuntimeError(f"streamlit завершился с кодом {proc.returncode}")
+		try:
+			if requests.get(f"{base_url}/_stcore/health", timeout=1).ok:
+				return proc, base_url
+		except requests.RequestException:
+			pass
+		time.sleep(0.2)
+	proc.kill()
+	raise RuntimeError("streamlit не поднялся за отведённое время")
+
+
+def process_stats(pid: int) -> Dict[str, float]:
+	"""CPU-время (сек), RSS (байт) и число потоков процесса из /proc."""
+	with open(f"/proc/{pid}/stat") as f:
+		fields = f.read().rsplit(")", 1)[1].split()
+	ticks = os.sysconf("SC_CLK_TCK")
+	stats = {"cpu_s": (int(fields[11]) + int(fields[12])) / ticks, "rss": 0.0, "threads": 0.0}
+	with open(f"/proc/{pid}/status") as f:
+		for line in f:
+			if line.startswith("VmRSS:"):
+				stats["rss"] = int(line.split()[1]) * 1024
+			elif line.startswith("Threads:"):
+				stats["threads"] = int(line.split()[1])
+	return stats
+
+
+class SimulatedSession:
+	"""Минимальный клиент протокола Streamlit: то же, что шлёт браузер."""
+
+	def __init__(self, base_url: str, timeout: float) -> None:
+		from websockets.sync.client import connect
+
+		self.base_url = base_url
+		self.timeout = timeout
+		self._stack = contextlib.ExitStack()
+		self.ws = self._stack.enter_context(connect(
+			base_url.replace("http", "ws", 1) + "/_stcore/stream",
+			subprotocols=["streamlit"],  # type: ignore[list-item]
+			max_size=None,
+			open_timeout=timeout,
+		))
+		self.session_id = ""
+		self.page_script_hash = ""
+		self.widgets: Dict[str, Any] = {}
+		self.widget_states: Dict[str, Any] = {}
+		self.latencies: List[float] = []
+		self.bytes_received = 0
+		self.errors: List[str] = []
+		self.completed = 0
+
+	def close(self) -> None:
+		self._stack.close()
+
+	def _send(self, msg: Any) -> None:
+		self.ws.send(msg.SerializeToString())
+
+	def _recv(self) -> Any:
+		from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+		raw = self.ws.recv(timeout=self.timeout)
+		self.bytes_received += len(raw)
+		msg = ForwardMsg()
+		msg.ParseFromString(raw)
+		return msg
+
+	def _track_element(self, delta: Any) -> None:
+		if not delta.HasField("new_element"):
+			return
+		element = delta.new_element
+		kind = element.WhichOneof("type")
+		if kind in ("button", "file_uploader", "text_area"):
+			widget = getattr(element, kind)
+			self.widgets[widget.label] = (kind, widget.id, delta.fragment_id)
+		elif kind == "exception":
+			self.errors.append(element.exception.message)
+		elif kind == "alert" and element.alert.body.startswith("Ошибка"):
+			self.errors.append(element.alert.body)
+		elif kind == "alert" and element.alert.body.startswith("Готово"):
+			self.completed += 1
+
+	def rerun(self, trigger_label: str | None = None, changed_label: str | None = None) -> None:
+		"""Отправляет rerun и ждёт script_finished.
+
+		trigger_label — нажатая кнопка, changed_label — виджет, значение которого
+		изменилось. Как и браузер, rerun ограничивается фрагментом этого виджета.
+		"""
+		from streamlit.proto.BackMsg_pb2 import BackMsg
+		from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+		msg = BackMsg()
+		client_state = msg.rerun_script
+		client_state.query_string = ""
+		client_state.page_script_hash = self.page_script_hash
+		for state in self.widget_states.values():
+			client_state.widget_states.widgets.append(state)
+		if trigger_label is not None:
+			_, widget_id, _ = self.widgets[trigger_label]
+			trigger = client_state.widget_states.widgets.add()
+			trigger.id = widget_id
+			trigger.trigger_value = True
+		scope_label = trigger_label or changed_label
+		if scope_label is not None:
+			fragment_id = self.widgets[scope_label][2]
+			if fragment_id:
+				client_state.fragment_id = fragment_id
+
+		start = time.perf_counter()
+		self._send(msg)
+		while True:
+			fwd = self._recv()
+			kind = fwd.WhichOneof("type")
+			if kind == "new_session":
+				self.session_id = fwd.new_session.initialize.session_id
+				self.page_script_hash = fwd.new_session.page_script_hash or fwd.new_session.main_script_hash
+			elif kind == "delta":
+				self._track_element(fwd.delta)
+			elif kind == "script_finished":
+				if fwd.script_finished == ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+					continue
+				if fwd.script_finished == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+					self.errors.append("ошибка компиляции app.py")
+				break
+		self.latencies.append(time.perf_counter() - start)
+
+	def set_text(self, label: str, value: str) -> None:
+		from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+		_, widget_id, _ = self.widgets[label]
+		self.widget_states[widget_id] = WidgetState(id=widget_id, string_value=value)
+
+	def upload(self, label: str, filename: str, content: bytes) -> None:
+		"""Запрашивает URL загрузки, кладёт файл PUT-ом и выставляет состояние виджета."""
+		import requests
+		from streamlit.proto.BackMsg_pb2 import BackMsg
+		from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+		msg = BackMsg()
+		msg.file_urls_request.request_id = "load-test"
+		msg.file_urls_request.file_names.append(filename)
+		msg.file_urls_request.session_id = self.session_id
+		self._send(msg)
+		while True:
+			fwd = self._recv()
+			if fwd.WhichOneof("type") == "file_urls_response":
+				break
+		if fwd.file_urls_response.error_msg:
+			raise RuntimeError(fwd.file_urls_response.error_msg)
+		urls = fwd.file_urls_response.file_urls[0]
+		resp = requests.put(
+			self.base_url + urls.upload_url,
+			files={"file": (filename, content, "application/pdf")},
+			timeout=self.timeout,
+		)
+		resp.raise_for_status()
+
+		_, widget_id, _ = self.widgets[label]
+		state = WidgetState(id=widget_id)
+		info = state.file_uploader_state_value.uploaded_file_info.add()
+		info.name = filename
+		info.size = len(content)
+		info.file_id = urls.file_id
+		info.file_urls.CopyFrom(urls)
+		self.widget_states[widget_id] = state
+
+
+SCENARIO_BUTTONS = ("Запустить анализ", "Сгенерировать улучшенное резюме", "Оценить зарплату")
+
+
+_session_counter = itertools.count()
+
+
+def run_session(base_url: str, timeout: float, sessions: List[SimulatedSession], errors: List[str]) -> None:
+	"""Один рекрутер: открыть страницу, ввести JD, загрузить PDF, нажать три кнопки."""
+	try:
+		session = SimulatedSession(base_url, timeout)
+		sessions.append(session)
+		session.rerun()
+		session.set_text("Описание вакансии", "Python, SQL, Docker")
+		session.rerun(changed_label="Описание вакансии")
+		session.upload("Загрузите PDF резюме", "resume.pdf", sample_resume_pdf(next(_session_counter)))
+		session.rerun(changed_label="Загрузите PDF резюме")
+		for label in SCENARIO_BUTTONS:
+			session.rerun(trigger_label=label)
+		if session.completed != len(SCENARIO_BUTTONS):
+			session.errors.append(f"завершено этапов: {session.completed} из {len(SCENARIO_BUTTONS)}")
+		errors.extend(session.errors)
+	except Exception as e:  # noqa: BLE001
+		errors.append(repr(e))
+
+
+def measure(pid: int, base_url: str, sessions: int, timeout: float) -> Dict[str, Any]:
+	"""Прогоняет `sessions` параллельных сессий и возвращает одну точку кривой."""
+	opened: List[SimulatedSession] = []
+	errors: List[str] = []
+	before = process_stats(pid)
+	peak_threads = before["threads"]
+	done = threading.Event()
+
+	def sample_threads() -> None:
+		nonlocal peak_threads
+		while not done.is_set():
+			peak_threads = max(peak_threads, process_stats(pid)["threads"])
+			time.sleep(0.05)
+
+	sampler = threading.Thread(target=sample_threads, daemon=True)
+	sampler.start()
+	wall_start = time.perf_counter()
+	workers = [
+		threading.Thread(target=run_session, args=(base_url, timeout, opened, errors))
+		for _ in range(sessions)
+	]
+	for w in workers:
+		w.start()
+	for w in workers:
+		w.join()
+	wall = time.perf_counter() - wall_start
+	# Сессии ещё открыты: RSS включает их состояние
+	after = process_stats(pid)
+	done.set()
+	sampler.join()
+
+	latencies = sorted(lat for s in opened for lat in s.latencies) or [0.0]
+	ws_bytes = sum(s.bytes_received for s in opened)
+	for s in opened:
+		s.close()
+
+	cpu = after["cpu_s"] - before["cpu_s"]
+	return {
+		"sessions": sessions,
+		"reruns": len(latencies),
+		"rerun_p50_ms": round(statistics.median(latencies) * 1000, 1),
+		"rerun_p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000, 1),
+		"rerun_max_ms": round(latencies[-1] * 1000, 1),
+		"wall_s": round(wall, 2),
+		"server_cpu_s": round(cpu, 2),
+		"server_cpu_util": round(cpu / wall, 2) if wall else 0.0,
+		"mem_per_session_kb": round((after["rss"] - before["rss"]) / 1024 / sessions, 1),
+		"ws_kb_per_session": round(ws_bytes / 1024 / sessions, 1),
+		"peak_threads": int(peak_threads),
+		"errors": errors,
+	}
+
+
+def main(argv: List[str] | None = None) -> int:
+	parser = argparse.ArgumentParser(description="Кривая ёмкости app.py под параллельными сессиями")
+	parser.add_argument("--sessions", default="1,2,4,8,16", help="список N через запятую")
+	parser.add_argument("--llm-latency", type=float, default=0.0, help="задержка mock-LLM, сек")
+	parser.add_argument("--timeout", type=float, default=60.0, help="таймаут одного перезапуска, сек")
+	parser.add_argument("--json", dest="json_path", help="куда сохранить результаты")
+	args = parser.parse_args(argv)
+
+	llm = start_mock_llm(args.llm_latency)
+	store_dir = tempfile.TemporaryDirectory(prefix="hr_load_test_store_")
+	proc = None
+
+	results = []
+	try:
+		proc, base_url = start_app_server(f"http://127.0.0.1:{llm.server_address[1]}/v1", store_dir.name)
+		print(
+			f"{'N':>4} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9} {'CPU s':>7} {'CPU %':>6} "
+			f"{'KB/сесс':>9} {'WS KB':>7} {'потоки':>7} {'ошибки':>7}"
+		)
+		# Прогрев: импорты, компиляция app.py и st.cache_data не должны попадать в N=1
+		measure(proc.pid, base_url, 1, args.timeout)
+		for n in (int(x) for x in args.sessions.split(",") if x.strip()):
+			row = measure(proc.pid, base_url, n, args.timeout)
+			results.append(row)
+			print(
+				f"{row['sessions']:>4} {row['rerun_p50_ms']:>9} {row['rerun_p95_ms']:>9} {row['rerun_max_ms']:>9} "
+				f"{row['server_cpu_s']:>7} {row['server_cpu_util'] * 100:>5.0f}% {row['mem_per_session_kb']:>9} "
+				f"{row['ws_kb_per_session']:>7} {row['peak_threads']:>7} {len(row['errors']):>7}"
+			)
+			for err in row["errors"][:3]:
+				print(f"     ! {err}", file=sys.stderr)
+	finally:
+		if proc is not None:
+			proc.terminate()
+			proc.wait(timeout=10)
+		llm.shutdown()
+		store_dir.cleanup()
+
+	if args.json_path:
+		with open(args.json_path, "wb") as f:
+			f.write(orjson.dumps(results, option=orjson.OPT_INDENT_2))
+	return 1 if any(r["errors"] for r in results) else 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -0,0 +1,211 @@
+"""Локальный stand-in OpenAI-совместимого API для нагрузочных и пакетных прогонов.
+
+Отдаёт фиксированные ответы Анализатора, Редактора и оценки зарплаты на
+/v1/chat/completions и эмулирует Batch API (/v1/files, /v1/batches): пакет
+проходит validating → in_progress → completed за два опроса; отменённый
+(/v1/batches/<id>/cancel) возвращает результаты первой половины запросов.
+"""
+from __future__ import annotations
+
+import threading
+import time
+import uuid
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+import orjson
+
+
+MOCK_ANALYSIS = {
+	"overall_assessment": "Резюме требует доработки.",
+	"top_issues": [
+		{"issue": "Нет метрик", "severity": "high", "why": "Не виден результат", "fix_suggestion": "Добавить цифры"},
+	],
+	"missing_data": [{"field": "dates", "note": "Нет дат работы"}],
+	"keywords_match": {"from_jd": ["Python", "SQL"], "found_in_resume": ["Python"], "missing": ["SQL"]},
+	"risks": ["Таблицы"],
+	"candidate_questions": ["Какие результаты в цифрах?"],
+	"priority_fix_list": ["Добавить метрики"],
+}
+
+MOCK_SALARY = {
+	"roles": [{"title": "Python-разработчик", "direction": "Разработка", "seniority": "Middle", "fit_reason": "Опыт"}],
+	"ranges_per_role": [{"title": "Python-разработчик", "min": 200000, "max": 300000, "median": 250000}],
+	"estimate_rub_month": {"min": 200000, "max": 300000, "median": 250000},
+	"confidence": "medium",
+	"assumptions": ["Москва"],
+	"notes": "Тестовый ответ",
+}
+
+MOCK_EDITOR = "## Что не так\n1. Нет метрик\n\n# Иван Иванов — Python-разработчик\n"
+
+
+def mock_completion(body: Dict[str, Any]) -> Dict[str, Any]:
+	"""Ответ chat.completion на тело запроса: этап узнаём по формату и системному промпту."""
+	if body.get("response_format", {}).get("type") == "json_object":
+		system = body["messages"][0]["content"]
+		content = orjson.dumps(MOCK_SALARY if "зарплат" in system else MOCK_ANALYSIS).decode()
+	else:
+		content = MOCK_EDITOR
+	return {
+		"id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+		"object": "chat.completion",
+		"created": int(time.time()),
+		"model": body.get("model", "mock"),
+		"choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+		"usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+	}
+
+
+class _MockOpenAIHandler(BaseHTTPRequestHandler):
+	latency = 0.0
+	files: Dict[str, Dict[str, Any]] = {}
+	batches: Dict[str, Dict[str, Any]] = {}
+	lock = threading.RLock()
+
+	def _read_body(self) -> bytes:
+		return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+	def _send(self, payload: bytes, status: int = 200, content_type: str = "application/json") -> None:
+		self.send_response(status)
+		self.send_header("Content-Type", content_type)
+		self.send_header("Content-Length", str(len(payload)))
+		self.end_headers()
+		self.wfile.write(payload)
+
+	def _send_json(self, obj: Any, status: int = 200) -> None:
+		self._send(orjson.dumps(obj), status)
+
+	def _not_found(self) -> None:
+		self._send_json({"error": {"message": f"not found: {self.path}", "type": "invalid_request_error"}}, 404)
+
+	def do_POST(self) -> None:  # noqa: N802
+		if self.path.endswith("/chat/completions"):
+			body = orjson.loads(self._read_body() or b"{}")
+			time.sleep(self.latency)
+			self._send_json(mock_completion(body))
+		elif self.path.endswith("/files"):
+			self._send_json(self._create_file())
+		elif self.path.endswith("/batches"):
+			self._send_json(self._create_batch(orjson.loads(self._read_body() or b"{}")))
+		elif self.path.endswith("/cancel") and self.path.split("/")[-2] in self.batches:
+			self._send_json(self._cancel_batch(self.path.split("/")[-2]))
+		else:
+			self._not_found()
+
+	def do_GET(self) -> None:  # noqa: N802
+		parts = self.path.split("?")[0].strip("/").split("/")
+		if len(parts) >= 3 and parts[-3] == "files" and parts[-1] == "content" and parts[-2] in self.files:
+			self._send(self.files[parts[-2]]["content"], content_type="application/octet-stream")
+		elif len(parts) >= 2 and parts[-2] == "batches" and parts[-1] in self.batches:
+			self._send_json(self._advance_batch(parts[-1]))
+		else:
+			self._not_found()
+
+	def _store_file(self, content: bytes, filename: str, purpose: str) -> Dict[str, Any]:
+		file_id = f"file-{uuid.uuid4().hex[:12]}"
+		meta = {
+			"id": file_id,
+			"object": "file",
+			"bytes": len(content),
+			"created_at": int(time.time()),
+			"filename": filename,
+			"purpose": purpose,
+			"status": "processed",
+		}
+		with self.lock:
+			self.files[file_id] = {**meta, "content": content}
+		return meta
+
+	def _create_file(self) -> Dict[str, Any]:
+		raw = self._read_body()
+		message = BytesParser(policy=HTTP).parsebytes(
+			f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode() + raw
+		)
+		content, filename, purpose = b"", "input.jsonl", "batch"
+		for part in message.iter_parts():
+			name = part.get_param("name", header="content-disposition")
+			if name == "file":
+				content = part.get_payload(decode=True) or b""
+				filename = part.get_filename() or filename
+			elif name == "purpose":
+				purpose = (part.get_payload(decode=True) or b"batch").decode()
+		return self._store_file(content, filename, purpose)
+
+	def _create_batch(self, params: Dict[str, Any]) -> Dict[str, Any]:
+		batch_id = f"batch_{uuid.uuid4().hex[:12]}"
+		batch = {
+			"id": batch_id,
+			"object": "batch",
+			"endpoint": params.get("endpoint", "/v1/chat/completions"),
+			"input_file_id": params["input_file_id"],
+			"completion_window": params.get("completion_window", "24h"),
+			"status": "validating",
+			"created_at": int(time.time()),
+			"output_file_id": None,
+			"error_file_id": None,
+			"request_counts": {"total": 0, "completed": 0, "failed": 0},
+		}
+		with self.lock:
+			self.batches[batch_id] = batch
+		return batch
+
+	def _advance_batch(self, batch_id: str) -> Dict[str, Any]:
+		with self.lock:
+			batch = self.batches[batch_id]
+			if batch["status"] == "validating":
+				batch["status"] = "in_progress"
+			elif batch["status"] == "in_progress":
+				self._complete_batch(batch)
+			elif batch["status"] == "cancelling":
+				# Как у OpenAI: в выходных файлах только запросы, выполненные до отмены
+				lines = [line for line in self.files[batch["input_file_id"]]["content"].splitlines() if line.strip()]
+				self._complete_batch(batch, lines[: len(lines) // 2], "cancelled")
+			return dict(batch)
+
+	def _cancel_batch(self, batch_id: str) -> Dict[str, Any]:
+		with self.lock:
+			batch = self.batches[batch_id]
+			if batch["status"] in ("validating", "in_progress"):
+				batch["status"] = "cancelling"
+			return dict(batch)
+
+	def _complete_batch(self, batch: Dict[str, Any], lines: Optional[List[bytes]] = None, status: str = "completed") -> None:
+		outputs, errors = [], []
+		if lines is None:
+			lines = self.files[batch["input_file_id"]]["content"].splitlines()
+		for line in lines:
+			if not line.strip():
+				continue
+			request = orjson.loads(line)
+			record = {"id": f"batch_req_{uuid.uuid4().hex[:12]}", "custom_id": request.get("custom_id")}
+			if not request.get("body", {}).get("messages"):
+				errors.append({**record, "response": None, "error": {"code": "invalid_request", "message": "messages is required"}})
+				continue
+			body = mock_completion(request["body"])
+			outputs.append({**record, "response": {"status_code": 200, "request_id": record["id"], "body": body}, "error": None})
+		now = int(time.time())
+		for key, records in (("output_file_id", outputs), ("error_file_id", errors)):
+			if records:
+				content = b"\n".join(orjson.dumps(r) for r in records) + b"\n"
+				batch[key] = self._store_file(content, f"{batch['id']}_{key}.jsonl", "batch_output")["id"]
+		batch["status"] = status
+		batch[f"{status}_at"] = now
+		batch["request_counts"] = {"total": len(outputs) + len(errors), "completed": len(outputs), "failed": len(errors)}
+
+	def log_message(self, format: str, *args: Any) -> None:
+		pass
+
+
+def start_mock_llm(latency: float = 0.0) -> ThreadingHTTPServer:
+	"""Поднимает stand-in на свободном порту; base_url: http://127.0.0.1:<port>/v1."""
+	handler = type(
+		"MockOpenAIHandler",
+		(_MockOpenAIHandler,),
+		{"latency": latency, "files": {}, "batches": {}, "lock": threading.RLock()},
+	)
+	server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+	threading.Thread(target=server.serve_forever, daemon=True).start()
+	return server
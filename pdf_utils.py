@@ -1,20 +1,147 @@
 from __future__ import annotations
 
-from typing import Iterable
+import re
+from typing import IO, Dict, Iterable, List, Tuple
 
 from pypdf import PdfReader
 
+from llm_client import estimate_tokens
 
-def extract_text_from_pdf(file_path: str) -> str:
+
+# Сколько строк сверху и снизу страницы считаются колонтитулом
+EDGE_LINES = 4
+
+PAGE_NUMBER_RE = re.compile(
+	r"^(?:[-–—\s]*\d{1,3}[-–—\s]*|(?:стр\.?|страница|page)\s*\d+(?:\s*(?:из|of|/)\s*\d+)?|\d+\s*(?:из|of|/)\s*\d+)$",
+	re.IGNORECASE,
+)
+# Служебные баннеры конструкторов резюме: дата в них меняется от страницы к странице
+BANNER_RE = re.compile(
+	r"^(?:резюме\s+)?(?:обновлено|сформировано|распечатано|дата\s+печати|(?:resume\s+)?updated|generated|printed)\b",
+	re.IGNORECASE,
+)
+# Голое число — номер страницы, только если стоит на одной позиции от края на 2+ страницах или первой/последней строкой
+BARE_NUMBER_RE = re.compile(r"^[-–—\s]*\d{1,3}[-–—\s]*$")
+DECORATIVE_RE = re.compile(r"^[\W_]+$")
+SOFT_HYPHEN = "\u00ad"
+HYPHEN_END_RE = re.compile(r"[^\W\d_][-\u00ad]$")
+WORD_RE = re.compile(r"[^\W\d_]+")
+
+
+def extract_text_from_pdf(file_path: str | IO[bytes]) -> str:
+	text, _ = extract_text_from_pdf_with_stats(file_path)
+	return text
+
+
+def extract_text_from_pdf_with_stats(file_path: str | IO[bytes]) -> Tuple[str, Dict[str, int]]:
+	"""Извлекает текст и возвращает его вместе со статистикой очистки."""
 	reader = PdfReader(file_path)
-	texts: list[str] = []
-	for page in reader.pages:
-		text = page.extract_text() or ""
-		texts.append(text)
-	raw = "\n\n".join(texts)
-	return normalize_whitespace(raw)
+	pages = [page.extract_text() or "" for page in reader.pages]
+	return clean_pages(pages)
 
 
 def normalize_whitespace(text: str) -> str:
 	lines = [" ".join(line.split()) for line in text.splitlines()]
 	return "\n".join(line for line in lines if line is not None)
+
+
+def _line_key(line: str) -> str:
+	# Цифры маскируем только в номерах страниц и баннерах («Резюме обновлено 3 марта»);
+	# остальные строки сравниваем точно, иначе «команда из 4 человек» съест «из 6 человек»
+	if PAGE_NUMBER_RE.match(line) or BANNER_RE.match(line):
+		return re.sub(r"\d+", "#", line.lower())
+	return line.lower()
+
+
+def _edge_keys(lines: List[str]) -> set[str]:
+	return {_line_key(line) for line in lines[:EDGE_LINES] + lines[-EDGE_LINES:]}
+
+
+def _edge_position(i: int, count: int) -> Tuple[str, int]:
+	return ("top", i) if i < count / 2 else ("bottom", count - 1 - i)
+
+
+def _join_wrap(head: str, tail: str, vocabulary: set[str]) -> str:
+	# Мягкий перенос убираем всегда. Обычный дефис — только если слово без него
+	# встречается в тексте («вре-» + «мя», а в резюме есть «время»); иначе это
+	# составное слово («интернет-магазин», «бизнес-аналитик») и дефис остаётся
+	if head.endswith(SOFT_HYPHEN):
+		return head[:-1] + tail
+	left = WORD_RE.findall(head)[-1]
+	right = WORD_RE.match(tail)
+	if right and (left + right.group()).lower() in vocabulary:
+		return head[:-1] + tail
+	return head + tail
+
+
+def _join_hyphenated(lines: List[str]) -> List[str]:
+	vocabulary = {word.lower() for line in lines for word in WORD_RE.findall(line.replace(SOFT_HYPHEN, ""))}
+	joined: List[str] = []
+	for line in lines:
+		if joined and HYPHEN_END_RE.search(joined[-1]) and line[0].islower():
+			joined[-1] = _join_wrap(joined[-1], line, vocabulary)
+		else:
+			joined.append(line)
+	return joined
+
+
+def clean_pages(pages: Iterable[str]) -> Tuple[str, Dict[str, int]]:
+	"""Убирает колонтитулы, номера страниц, декоративные строки и переносы.
+
+	Номера страниц ищутся только среди краевых строк страницы; голое число
+	считается номером, если на той же позиции от края число стоит хотя бы на
+	двух страницах или это первая/последняя строка страницы многостраничного
+	документа (одностраничное резюме с «Стаж, лет: 12» не страдает). Строки из
+	верхних/нижних EDGE_LINES строк, повторяющиеся хотя бы на двух страницах,
+	остаются только при первом появлении (имя и контакты нужны один раз).
+	Переносы склеиваются; дефис удаляется только при явных признаках переноса.
+	Возвращает текст и сколько символов и токенов удалено относительно
+	простой склейки страниц.
+	"""
+	page_lines = [[" ".join(line.split()) for line in page.splitlines()] for page in pages]
+	page_lines = [[line for line in lines if line] for lines in page_lines]
+
+	edge_counts: Dict[str, int] = {}
+	for lines in page_lines:
+		for key in _edge_keys(lines):
+			edge_counts[key] = edge_counts.get(key, 0) + 1
+	repeated = {key for key, count in edge_counts.items() if count >= 2}
+
+	# Позиции (сверху/снизу), где голое число стоит хотя бы на двух страницах
+	number_positions: Dict[Tuple[str, int], int] = {}
+	for lines in page_lines:
+		for i, line in enumerate(lines):
+			if (i < EDGE_LINES or i >= len(lines) - EDGE_LINES) and BARE_NUMBER_RE.match(line):
+				pos = _edge_position(i, len(lines))
+				number_positions[pos] = number_positions.get(pos, 0) + 1
+
+	multi_page = len(page_lines) > 1
+	seen: set[str] = set()
+	out: List[str] = []
+	for lines in page_lines:
+		edges = _edge_keys(lines)
+		for i, line in enumerate(lines):
+			if DECORATIVE_RE.match(line):
+				continue
+			key = _line_key(line)
+			at_edge = i < EDGE_LINES or i >= len(lines) - EDGE_LINES
+			if at_edge and PAGE_NUMBER_RE.match(line):
+				outermost = multi_page and i in (0, len(lines) - 1)
+				in_number_slot = number_positions.get(_edge_position(i, len(lines)), 0) >= 2
+				if not BARE_NUMBER_RE.match(line) or in_number_slot or outermost:
+					continue
+			if key in repeated and key in edges:
+				if key in seen:
+					continue
+				seen.add(key)
+			out.append(line)
+
+	text = "\n".join(_join_hyphenated(out)).replace(SOFT_HYPHEN, "")
+	raw = normalize_whitespace("\n\n".join(pages))
+	stats = {
+		"chars_before": len(raw),
+		"chars_after": len(text),
+		"chars_removed": max(0, len(raw) - len(text)),
+		"tokens_removed": max(0, estimate_tokens(raw) - estimate_tokens(text)),
+	}
+	return text, stats
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from editor_handoff import build_editor_handoff, editor_handoff_with_stats
+from prompts import (
+	ANALYZER_SYSTEM_PROMPT,
+	ANALYZER_USER_TEMPLATE,
+	EDITOR_SYSTEM_PROMPT,
+	EDITOR_USER_TEMPLATE,
+)
+from result_store import result_key
+from salary_estimator import DEFAULT_SALARY_MODEL, build_salary_messages
+
+ANALYZER_MODEL = os.getenv("ANALYZER_MODEL", "gpt-4o-mini")
+EDITOR_MODEL = os.getenv("EDITOR_MODEL", "gpt-4o")
+
+# Параметры вызова по этапам: одинаковы для интерактивного и пакетного режима
+STAGES: Dict[str, Dict[str, Any]] = {
+	"analyzer": {"model": ANALYZER_MODEL, "temperature": 0.1, "json": True},
+	"editor": {"model": EDITOR_MODEL, "temperature": 0.3, "json": False},
+	"salary": {"model": DEFAULT_SALARY_MODEL, "temperature": 0.1, "json": True},
+}
+
+
+def stage_result_key(
+	resume_id: str,
+	job_description: str,
+	stage: str,
+	analysis_json: Optional[Dict[str, Any]] = None,
+) -> str:
+	"""Ключ общего хранилища для этапа; ключ Редактора включает выжимку анализа."""
+	depends_on = build_editor_handoff(analysis_json) if stage == "editor" and analysis_json is not None else ""
+	return result_key(resume_id, job_description, stage, STAGES[stage]["model"], depends_on)
+
+
+def build_analyzer_messages(resume_text: str, job_description: str = "") -> List[Dict[str, Any]]:
+	user_prompt = ANALYZER_USER_TEMPLATE.format(
+		resume_text=resume_text,
+		job_description=job_description or "",
+	)
+	return [
+		{"role": "system", "content": ANALYZER_SYSTEM_PROMPT},
+		{"role": "user", "content": user_prompt},
+	]
+
+
+def build_editor_messages(
+	analysis_json: Dict[str, Any],
+	resume_text: str,
+	job_description: str = "",
+) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+	"""Сообщения для Редактора и статистика сжатия вывода Анализатора."""
+	analyzer_summary, handoff_stats = editor_handoff_with_stats(analysis_json)
+	user_prompt = EDITOR_USER_TEMPLATE.format(
+		analyzer_summary=analyzer_summary,
+		resume_text=resume_text,
+		job_description=job_description or "",
+	)
+	messages = [
+		{"role": "system", "content": EDITOR_SYSTEM_PROMPT},
+		{"role": "user", "content": user_prompt},
+	]
+	return messages, handoff_stats
+
+
+def build_stage_messages(
+	stage: str,
+	resume_text: str,
+	job_description: str = "",
+	analysis_json: Optional[Dict[str, Any]] = None,
+) -> List[Dict[str, Any]]:
+	if stage == "analyzer":
+		return build_analyzer_messages(resume_text, job_description)
+	if stage == "salary":
+		return build_salary_messages(resume_text, job_description or None)
+	if stage == "editor":
+		return build_editor_messages(analysis_json or {}, resume_text, job_description)[0]
+	raise ValueError(f"unknown stage: {stage}")
@@ -139,8 +139,8 @@ EDITOR_SYSTEM_PROMPT = """Ты – старший HR-рекрутер и опы
 - ПЕРЕД отправкой ответа проверь все текстовые поля на правильность написания имен."""
 
 EDITOR_USER_TEMPLATE = """Входные данные:
-[АНАЛИЗ ОТ АНАЛИЗАТОРА]
-{analyzer_json}
+[АНАЛИЗ ОТ АНАЛИЗАТОРА — сжатая выжимка]
+{analyzer_summary}
 
 [ОРИГИНАЛЬНОЕ РЕЗЮМЕ]
 {resume_text}
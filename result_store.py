@@ -0,0 +1,165 @@
+"""Общее хранилище результатов LLM для всех сессий и пакетного режима.
+
+Ключ — (хэш резюме, хэш JD, этап, модель, у Редактора ещё хэш анализа). Два уровня: память (LRU,
+ограничение в байтах) и диск (по файлу на ключ, LRU по mtime, ограничение
+в байтах). Сессии Streamlit держат только ключи, поэтому память сервера
+не растёт с числом сессий, а повторно открытая сессия получает результат
+с диска без нового вызова LLM.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import orjson
+
+
+DEFAULT_STORE_DIR = os.getenv("RESULT_STORE_DIR", ".result_store")
+DEFAULT_MEMORY_MB = float(os.getenv("RESULT_STORE_MEMORY_MB", "64"))
+DEFAULT_DISK_MB = float(os.getenv("RESULT_STORE_DISK_MB", "512"))
+# Ключи приходят и из URL приложения, а становятся именами файлов
+KEY_RE = re.compile(r"^[\w.:+-]+$")
+
+
+def text_hash(text: str) -> str:
+	return hashlib.sha256(text.strip().encode("utf-8")).hexdigest()[:16]
+
+
+def result_key(resume_id: str, job_description: str, stage: str, model: str, depends_on: str = "") -> str:
+	"""Ключ результата: хэш резюме, хэш JD (пустой JD — тоже JD), этап и модель.
+
+	depends_on — вход от предыдущего этапа (для Редактора — выжимка анализа):
+	другой анализ того же резюме даёт другой ключ.
+	"""
+	key = f"{resume_id}-{text_hash(job_description or '')}-{stage}-{model}"
+	if depends_on:
+		key += f"-{text_hash(depends_on)}"
+	return key.replace("/", "_")
+
+
+def _valid_key(key: str) -> bool:
+	return bool(KEY_RE.match(key)) and ".." not in key
+
+
+class ResultStore:
+	def __init__(
+		self,
+		directory: Optional[str] = DEFAULT_STORE_DIR,
+		memory_bytes: int = int(DEFAULT_MEMORY_MB * 1024 * 1024),
+		disk_bytes: int = int(DEFAULT_DISK_MB * 1024 * 1024),
+	) -> None:
+		self.directory = directory
+		self.memory_bytes = memory_bytes
+		self.disk_bytes = disk_bytes
+		self._memory: "OrderedDict[str, Tuple[Any, int]]" = OrderedDict()
+		self._memory_used = 0
+		self._disk_used = 0
+		self._lock = threading.Lock()
+		if directory:
+			os.makedirs(directory, exist_ok=True)
+			self._disk_used = sum(size for _, size, _ in self._disk_entries())
+
+	def _path(self, key: str) -> str:
+		return os.path.join(self.directory or "", f"{key}.json")
+
+	def _disk_entries(self) -> list[Tuple[str, int, float]]:
+		entries = []
+		for entry in os.scandir(self.directory or "."):
+			if entry.name.endswith(".json"):
+				try:
+					stat = entry.stat()
+				except FileNotFoundError:
+					continue
+				entries.append((entry.path, stat.st_size, stat.st_mtime))
+		return entries
+
+	def _remember(self, key: str, value: Any, size: int) -> None:
+		if size > self.memory_bytes:
+			return
+		if key in self._memory:
+			self._memory_used -= self._memory.pop(key)[1]
+		self._memory[key] = (value, size)
+		self._memory_used += size
+		while self._memory_used > self.memory_bytes:
+			_, (_, evicted) = self._memory.popitem(last=False)
+			self._memory_used -= evicted
+
+	def _touch(self, key: str) -> None:
+		# LRU на диске — по времени последнего чтения, в том числе из памяти:
+		# иначе самые горячие записи первыми уходят с диска
+		try:
+			os.utime(self._path(key))
+		except FileNotFoundError:
+			pass
+
+	def get(self, key: str) -> Any:
+		if not _valid_key(key):
+			return None
+		with self._lock:
+			if key in self._memory:
+				self._memory.move_to_end(key)
+				value = self._memory[key][0]
+			else:
+				value = None
+		if value is not None:
+			if self.directory:
+				self._touch(key)
+			return value
+		if not self.directory:
+			return None
+		try:
+			with open(self._path(key), "rb") as f:
+				raw = f.read()
+		except FileNotFoundError:
+			return None
+		self._touch(key)
+		value = orjson.loads(raw)
+		with self._lock:
+			self._remember(key, value, len(raw))
+		return value
+
+	def put(self, key: str, value: Any) -> None:
+		if not _valid_key(key):
+			raise ValueError(f"недопустимый ключ: {key!r}")
+		raw = orjson.dumps(value)
+		with self._lock:
+			self._remember(key, value, len(raw))
+		if not self.directory:
+			return
+		path = self._path(key)
+		tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+		with open(tmp_path, "wb") as f:
+			f.write(raw)
+		try:
+			old_size = os.path.getsize(path)
+		except FileNotFoundError:
+			old_size = 0
+		os.replace(tmp_path, path)
+		with self._lock:
+			self._disk_used += len(raw) - old_size
+			if self._disk_used > self.disk_bytes:
+				self._evict_disk()
+
+	def _evict_disk(self) -> None:
+		entries = sorted(self._disk_entries(), key=lambda e: e[2])
+		self._disk_used = sum(size for _, size, _ in entries)
+		for path, size, _ in entries:
+			if self._disk_used <= self.disk_bytes:
+				break
+			try:
+				os.remove(path)
+			except FileNotFoundError:
+				pass
+			self._disk_used -= size
+
+	def stats(self) -> Dict[str, int]:
+		with self._lock:
+			return {
+				"memory_items": len(self._memory),
+				"memory_bytes": self._memory_used,
+				"disk_bytes": self._disk_used,
+			}
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import os
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 from llm_client import chat_json
 
@@ -52,27 +52,11 @@ def estimate_salary_rub(
 	return resp
 
 
-def estimate_salary_from_resume(
+def build_salary_messages(
 	resume_text: str,
 	job_description: Optional[str] = None,
-	model: str = DEFAULT_SALARY_MODEL,
-	temperature: float = 0.1,
-) -> Dict[str, Any]:
-	"""Infer suitable roles/directions and estimate salary ranges from resume text.
-
-	Returns JSON with:
-	{
-	  "roles": [{"title": str, "direction": str, "seniority": str|null, "fit_reason": str}],
-	  "ranges_per_role": [{"title": str, "min": int, "max": int, "median": int}],
-	  "estimate_rub_month": {"min": int, "max": int, "median": int},
-	  "confidence": "low|medium|high",
-	  "assumptions": [str],
-	  "notes": str
-	}
-	"""
-	if not resume_text.strip():
-		raise ValueError("resume_text is required")
-
+) -> List[Dict[str, Any]]:
+	"""Messages for the resume-based salary estimate (shared by interactive and batch runs)."""
 	system_prompt = (
 		"Ты – HR-аналитик рынка труда в РФ. По тексту резюме (и при наличии JD) "
 		"определи 3–5 подходящих направлений/профессий и оцени вилку зарплат в рублях/мес. "
@@ -106,6 +90,30 @@ def estimate_salary_from_resume(
 		{"role": "system", "content": system_prompt},
 		{"role": "user", "content": user_prompt},
 	]
+	return messages
+
+
+def estimate_salary_from_resume(
+	resume_text: str,
+	job_description: Optional[str] = None,
+	model: str = DEFAULT_SALARY_MODEL,
+	temperature: float = 0.1,
+) -> Dict[str, Any]:
+	"""Infer suitable roles/directions and estimate salary ranges from resume text.
 
+	Returns JSON with:
+	{
+	  "roles": [{"title": str, "direction": str, "seniority": str|null, "fit_reason": str}],
+	  "ranges_per_role": [{"title": str, "min": int, "max": int, "median": int}],
+	  "estimate_rub_month": {"min": int, "max": int, "median": int},
+	  "confidence": "low|medium|high",
+	  "assumptions": [str],
+	  "notes": str
+	}
+	"""
+	if not resume_text.strip():
+		raise ValueError("resume_text is required")
+
+	messages = build_salary_messages(resume_text, job_description)
 	resp = chat_json(messages=messages, model=model, temperature=temperature)
-	return resp
\ No newline at end of file
+	return resp
@@ -0,0 +1,107 @@
+import orjson
+import pytest
+from openai import OpenAI
+
+from batch_mode import BulkRun, make_custom_id, split_custom_id
+from mock_openai import start_mock_llm
+from pipeline import stage_result_key
+from result_store import ResultStore, text_hash
+
+
+RESUMES = {
+	"a.txt": "Иван Иванов\nPython-разработчик, 5 лет опыта\nDjango, PostgreSQL",
+	"b.txt": "Пётр Петров\nТестировщик, 2 года опыта\nSelenium, pytest",
+}
+
+
+@pytest.fixture
+def client():
+	server = start_mock_llm()
+	yield OpenAI(api_key="test", base_url=f"http://127.0.0.1:{server.server_address[1]}/v1")
+	server.shutdown()
+
+
+@pytest.fixture
+def paths(tmp_path):
+	result = []
+	for name, text in RESUMES.items():
+		path = tmp_path / name
+		path.write_text(text, encoding="utf-8")
+		result.append(str(path))
+	return result
+
+
+def _read_jsonl(path):
+	with open(path, "rb") as f:
+		return [orjson.loads(line) for line in f if line.strip()]
+
+
+def _result(work_dir, resume_id):
+	with open(work_dir / "results" / f"{resume_id}.json", "rb") as f:
+		return orjson.loads(f.read())
+
+
+def test_custom_id_roundtrip():
+	assert make_custom_id("abc123", "analyzer") == "abc123:analyzer"
+	assert split_custom_id("abc123:editor") == ("abc123", "editor")
+
+
+def test_full_run_writes_results_and_store(tmp_path, client, paths):
+	work_dir = tmp_path / "run"
+	store = ResultStore(directory=str(tmp_path / "store"))
+	run = BulkRun(str(work_dir), store=store)
+	run.submit(client, paths, "Python, SQL")
+
+	ids = [text_hash(text) for text in RESUMES.values()]
+	requests = _read_jsonl(work_dir / "requests_analyze.jsonl")
+	assert [r["custom_id"] for r in requests] == [
+		make_custom_id(resume_id, stage) for resume_id in ids for stage in ("analyzer", "salary")
+	]
+	assert run.collect(client, wait=True, poll_interval=0) == "done"
+
+	for resume_id in ids:
+		result = _result(work_dir, resume_id)
+		assert result["resume_hash"] == resume_id
+		assert result["errors"] == {}
+		assert isinstance(result["analysis_json"], dict)
+		assert isinstance(result["salary_json"], dict)
+		assert isinstance(result["editor_output"], str)
+		# Те же ключи, по которым результат найдёт app.py
+		assert store.get(stage_result_key(resume_id, "Python, SQL", "analyzer")) == result["analysis_json"]
+		editor_key = stage_result_key(resume_id, "Python, SQL", "editor", result["analysis_json"])
+		assert store.get(editor_key) == result["editor_output"]
+
+
+def test_cancelled_batch_is_collected_partially(tmp_path, client, paths):
+	work_dir = tmp_path / "run"
+	run = BulkRun(str(work_dir))
+	batch_id = run.submit(client, paths)
+	client.batches.cancel(batch_id)
+	assert run.collect(client, wait=True, poll_interval=0) == "done"
+
+	done_id, cancelled_id = (text_hash(text) for text in RESUMES.values())
+	# Редактор запрашивается только для резюме, чей анализ реально получен
+	edit_requests = _read_jsonl(work_dir / "requests_edit.jsonl")
+	assert [r["custom_id"] for r in edit_requests] == [make_custom_id(done_id, "editor")]
+
+	done = _result(work_dir, done_id)
+	assert done["errors"] == {}
+	assert "editor_output" in done
+	cancelled = _result(work_dir, cancelled_id)
+	assert cancelled["errors"] == {"analyzer": "batch cancelled", "salary": "batch cancelled"}
+	assert "analysis_json" not in cancelled and "editor_output" not in cancelled
+
+
+def test_new_run_does_not_merge_into_old_results(tmp_path, client, paths):
+	work_dir = tmp_path / "run"
+	run = BulkRun(str(work_dir))
+	run.submit(client, paths[:1])
+	run.collect(client, wait=True, poll_interval=0)
+
+	batch_id = run.submit(client, paths[:1], "Go, Kubernetes")
+	client.batches.cancel(batch_id)
+	run.collect(client, wait=True, poll_interval=0)
+
+	result = _result(work_dir, text_hash(RESUMES["a.txt"]))
+	assert result["errors"] == {"salary": "batch cancelled"}
+	assert "editor_output" in result and "salary_json" not in result
@@ -0,0 +1,52 @@
+from editor_handoff import build_editor_handoff, editor_handoff_with_stats
+
+
+ANALYSIS = {
+	"overall_assessment": "Резюме требует доработки",
+	"оценка_структуры": {"рейтинг": 6, "обоснование": "Нет раздела достижений"},
+	"top_issues": [
+		{"severity": "high", "issue": "Нет метрик", "why": "Не виден результат", "fix_suggestion": "Добавить цифры"},
+		"Слишком длинное резюме",
+	],
+	"missing_data": [{"field": "dates", "note": "Нет дат в последнем месте"}, "Город"],
+	"keywords_match": {"found_in_resume": ["Python", "Django"], "missing": ["Kubernetes", "SQL"]},
+	"risks": ["Таблицы ломают парсинг ATS"],
+	"priority_fix_list": ["Добавить метрики", "Сократить до двух страниц"],
+	"candidate_questions": ["Какой был размер команды?"],
+}
+
+
+def test_drops_ratings_risks_and_found_keywords():
+	handoff = build_editor_handoff(ANALYSIS)
+	for dropped in ("Резюме требует доработки", "Нет раздела достижений", "Таблицы ломают", "Django"):
+		assert dropped not in handoff
+
+
+def test_keeps_what_the_editor_uses():
+	handoff = build_editor_handoff(ANALYSIS)
+	assert "H Нет метрик | Не виден результат | Добавить цифры" in handoff
+	assert "- dates: Нет дат в последнем месте" in handoff
+	assert "НЕТ КЛЮЧЕВЫХ СЛОВ: Kubernetes, SQL" in handoff
+	assert "1. Добавить метрики\n2. Сократить до двух страниц" in handoff
+	assert "- Какой был размер команды?" in handoff
+
+
+def test_tolerates_non_dict_items():
+	handoff = build_editor_handoff(ANALYSIS)
+	assert "- Слишком длинное резюме" in handoff
+	assert "- Город" in handoff
+
+
+def test_empty_analysis():
+	assert build_editor_handoff({}) == "—"
+	assert build_editor_handoff({"top_issues": [], "keywords_match": {}}) == "—"
+
+
+def test_saved_tokens_never_negative():
+	_, stats = editor_handoff_with_stats(ANALYSIS)
+	assert stats["handoff_tokens"] < stats["full_tokens"]
+	assert stats["saved_tokens"] == stats["full_tokens"] - stats["handoff_tokens"]
+	# Выжимка длиннее компактного JSON: экономии нет, но и отрицательной она не бывает
+	_, stats = editor_handoff_with_stats({"top_issues": [{"severity": "low"}]})
+	assert stats["handoff_tokens"] > stats["full_tokens"]
+	assert stats["saved_tokens"] == 0
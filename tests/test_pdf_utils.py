@@ -0,0 +1,91 @@
+from pdf_utils import clean_pages
+
+
+HEADER = "Иван Иванов\n+7 999 123-45-67 • ivan@example.com\n"
+
+
+def test_repeated_header_kept_once():
+	text, _ = clean_pages([HEADER + "Опыт работы\nООО Ромашка", HEADER + "Образование\nМГУ"])
+	assert text.count("Иван Иванов") == 1
+	assert text.count("ivan@example.com") == 1
+	assert "ООО Ромашка" in text and "МГУ" in text
+
+
+def test_lines_differing_only_in_numbers_are_kept():
+	page1 = "Опыт работы\nРуководитель группы\nЛидировал команду из 4 человек"
+	page2 = "Лидировал команду из 6 человек\nСтаж 2 года 1 месяц"
+	page3 = "Стаж 3 года 5 месяцев\nНавыки"
+	text, _ = clean_pages([page1, page2, page3])
+	assert "Лидировал команду из 4 человек" in text
+	assert "Лидировал команду из 6 человек" in text
+	assert "Стаж 2 года 1 месяц" in text
+	assert "Стаж 3 года 5 месяцев" in text
+
+
+def test_banner_with_changing_date_dropped_after_first_page():
+	banner1 = "Резюме обновлено 3 марта 2024 в 10:00\n"
+	banner2 = "Резюме обновлено 4 марта 2024 в 11:30\n"
+	text, _ = clean_pages([banner1 + "Опыт работы", banner2 + "Образование"])
+	assert text.count("Резюме обновлено") == 1
+
+
+def test_page_numbers_and_decorative_lines_dropped():
+	text, _ = clean_pages(["Опыт работы\n-----\nСтраница 1 из 2", "Навыки\n•\n2"])
+	assert text == "Опыт работы\nНавыки"
+
+
+def test_bare_number_inside_page_is_kept():
+	middle = "\n".join(f"строка {i}" for i in range(10))
+	text, _ = clean_pages([f"Начало\n{middle[:40]}\n2019\n{middle}\nКонец"])
+	assert "2019" in text
+
+
+def test_one_page_resume_keeps_short_numbers():
+	text, _ = clean_pages(["Иван Иванов\nСтаж, лет:\n12\nPython"])
+	assert text == "Иван Иванов\nСтаж, лет:\n12\nPython"
+
+
+def test_bare_page_numbers_dropped_when_repeated_on_edges():
+	pages = ["1\nОпыт работы\nСтаж, лет:\n12\nООО Ромашка\nPython", "2\nНавыки\nSQL"]
+	text, _ = clean_pages(pages)
+	assert text.splitlines() == ["Опыт работы", "Стаж, лет:", "12", "ООО Ромашка", "Python", "Навыки", "SQL"]
+
+
+def test_page_number_above_footer_dropped():
+	pages = ["Опыт работы\nООО Ромашка\n1\nivan@example.com", "Навыки\nSQL\n2\nivan@example.com"]
+	text, _ = clean_pages(pages)
+	assert text.splitlines() == ["Опыт работы", "ООО Ромашка", "ivan@example.com", "Навыки", "SQL"]
+
+
+def test_wrap_hyphen_removed_when_word_is_known():
+	text, _ = clean_pages(["сократив вре-\nмя реакции; время ответа"])
+	assert "сократив время реакции" in text
+
+
+def test_soft_hyphen_always_removed():
+	text, _ = clean_pages(["разра\u00ad\nботал сервис"])
+	assert text == "разработал сервис"
+
+
+def test_compound_words_keep_hyphen():
+	text, _ = clean_pages([
+		"вёл интернет-\nмагазин, state-of-the-\nart, бизнес-\nаналитик, веб-\nразработчик, "
+		"топ-\nменеджер, из-\nза сроков, Python-\nразработчик"
+	])
+	for word in (
+		"интернет-магазин",
+		"state-of-the-art",
+		"бизнес-аналитик",
+		"веб-разработчик",
+		"топ-менеджер",
+		"из-за",
+		"Python-разработчик",
+	):
+		assert word in text
+
+
+def test_stats_report_removed_chars_and_tokens():
+	text, stats = clean_pages([HEADER + "Опыт работы\nСтраница 1 из 2", HEADER + "Навыки\nСтраница 2 из 2"])
+	assert stats["chars_after"] == len(text)
+	assert stats["chars_removed"] == stats["chars_before"] - stats["chars_after"] > 0
+	assert stats["tokens_removed"] > 0
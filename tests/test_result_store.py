@@ -0,0 +1,70 @@
+import os
+import time
+
+import pytest
+
+from result_store import ResultStore
+
+
+def _value(i: int) -> dict:
+	return {"id": i, "text": "x" * 100}
+
+
+SIZE = len(b'{"id":0,"text":"' + b"x" * 100 + b'"}')
+
+
+def _age_files(directory: str) -> None:
+	# mtime у файлов одной секунды может совпасть — разводим их явно
+	for i, name in enumerate(sorted(os.listdir(directory), key=lambda n: os.path.getmtime(os.path.join(directory, n)))):
+		past = time.time() - 100 + i
+		os.utime(os.path.join(directory, name), (past, past))
+
+
+def test_memory_is_bounded_in_bytes():
+	store = ResultStore(directory=None, memory_bytes=SIZE * 3)
+	for i in range(5):
+		store.put(f"k{i}", _value(i))
+	stats = store.stats()
+	assert stats["memory_items"] == 3
+	assert stats["memory_bytes"] <= SIZE * 3
+	assert store.get("k0") is None
+	assert store.get("k4") == _value(4)
+
+
+def test_memory_evicts_least_recently_used():
+	store = ResultStore(directory=None, memory_bytes=SIZE * 2)
+	store.put("a", _value(1))
+	store.put("b", _value(2))
+	store.get("a")
+	store.put("c", _value(3))
+	assert store.get("a") == _value(1)
+	assert store.get("b") is None
+
+
+def test_disk_is_bounded_and_keeps_hot_entries(tmp_path):
+	store = ResultStore(directory=str(tmp_path), memory_bytes=SIZE * 10, disk_bytes=SIZE * 3)
+	for key in ("hot", "a", "b"):
+		store.put(key, _value(0))
+	_age_files(str(tmp_path))
+	# Чтение из памяти тоже продлевает жизнь файла на диске
+	assert store.get("hot") == _value(0)
+	store.put("c", _value(0))
+	names = sorted(os.listdir(tmp_path))
+	assert names == ["b.json", "c.json", "hot.json"]
+	assert store.stats()["disk_bytes"] <= SIZE * 3
+
+
+def test_results_survive_restart(tmp_path):
+	ResultStore(directory=str(tmp_path)).put("k", _value(1))
+	store = ResultStore(directory=str(tmp_path))
+	assert store.stats()["disk_bytes"] == SIZE
+	assert store.get("k") == _value(1)
+	assert store.stats()["memory_items"] == 1
+
+
+def test_keys_outside_the_store_directory_are_rejected(tmp_path):
+	store = ResultStore(directory=str(tmp_path / "store"))
+	(tmp_path / "secret.json").write_bytes(b'{"x": 1}')
+	assert store.get("../secret") is None
+	with pytest.raises(ValueError):
+		store.put("../secret", _value(1))